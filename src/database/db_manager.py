@@ -1,6 +1,6 @@
 import os
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from dotenv import load_dotenv
 import tempfile
 import hashlib
@@ -16,9 +16,15 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DatabaseManager:
-    def __init__(self):
+    # Session timing writes (finalize_session and the batched save_page_times)
+    # are frequent and cheap to lose on a server crash, so their transactions
+    # skip waiting for the WAL flush on commit
+    ASYNC_COMMIT_SQL = "SET LOCAL synchronous_commit TO OFF"
+    
+    def __init__(self, read_only=False):
         self.connection = None
         self.cursor = None
+        self.read_only = read_only
         self.has_file_data = False
         self.max_retry_attempts = 3
         self.retry_delay = 1  # seconds
@@ -43,6 +49,10 @@ class DatabaseManager:
                     cursor_factory=RealDictCursor,
                     connect_timeout=10
                 )
+                if self.read_only:
+                    # Reads run outside any explicit transaction, so a reporting
+                    # connection never sits idle in an open transaction
+                    self.connection.set_session(readonly=True, autocommit=True)
                 self.cursor = self.connection.cursor()
                 
                 # Test connection
@@ -714,124 +724,157 @@ class DatabaseManager:
             logger.error(f"Failed to create session: {e}")
             raise
 
-    def end_session(self, session_id, total_time_seconds, active_time_seconds, idle_time_seconds, pages_visited):
-        """End a reading session with statistics"""
+    def finalize_session(self, session_id, total_time_seconds, active_time_seconds, idle_time_seconds, pages_visited=None):
+        """End a reading session and fold it into reading metrics in one transaction
+        
+        Reading metrics are only updated when the session has both active time and pages.
+        If that update fails the session is still closed and the error is only logged.
+        """
         self.connect()
         
         try:
             with self.transaction():
-                self.cursor.execute("""
-                    UPDATE sessions 
-                    SET end_time = CURRENT_TIMESTAMP,
-                        total_time_seconds = %s,
-                        active_time_seconds = %s,
-                        idle_time_seconds = %s,
-                        pages_visited = %s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                    RETURNING pdf_id, exercise_pdf_id, topic_id
-                """, (total_time_seconds, active_time_seconds, idle_time_seconds, pages_visited, session_id))
+                self.cursor.execute(self.ASYNC_COMMIT_SQL)
+                session_stats = self._close_session(session_id, total_time_seconds, active_time_seconds,
+                                                    idle_time_seconds, pages_visited)
+                
+                pages_read = session_stats['pages_visited'] if session_stats else 0
+                if pages_read and active_time_seconds > 0:
+                    # A failed metrics update must not undo closing the session
+                    self.cursor.execute("SAVEPOINT reading_metrics")
+                    try:
+                        self._upsert_reading_metrics(
+                            pdf_id=session_stats['pdf_id'],
+                            exercise_pdf_id=session_stats['exercise_pdf_id'],
+                            topic_id=session_stats['topic_id'],
+                            pages_per_minute=pages_read / (active_time_seconds / 60.0),
+                            average_time_per_page_seconds=active_time_seconds / pages_read,
+                            pages_read=pages_read,
+                            time_spent_seconds=active_time_seconds
+                        )
+                    except Exception as e:
+                        self.cursor.execute("ROLLBACK TO SAVEPOINT reading_metrics")
+                        logger.error(f"Failed to update reading metrics for session {session_id}: {e}")
+                
+                return session_stats
                 
-                result = self.cursor.fetchone()
-                if result:
-                    logger.info(f"Ended session {session_id}: {total_time_seconds}s total, {pages_visited} pages")
-                    return {
-                        'session_id': session_id,
-                        'total_time_seconds': total_time_seconds,
-                        'active_time_seconds': active_time_seconds,
-                        'idle_time_seconds': idle_time_seconds,
-                        'pages_visited': pages_visited,
-                        'pdf_id': result['pdf_id'],
-                        'exercise_pdf_id': result['exercise_pdf_id'],
-                        'topic_id': result['topic_id']
-                    }
-                else:
-                    logger.warning(f"Session {session_id} not found")
-                    return None
-                    
         except Exception as e:
-            logger.error(f"Failed to end session {session_id}: {e}")
+            logger.error(f"Failed to finalize session {session_id}: {e}")
             raise
 
-    def save_page_time(self, session_id, pdf_id=None, exercise_pdf_id=None, page_number=1, duration_seconds=0):
-        """Save time spent on a specific page"""
+    def _close_session(self, session_id, total_time_seconds, active_time_seconds, idle_time_seconds, pages_visited):
+        """Write a session's end statistics inside the caller's transaction"""
+        self.cursor.execute("""
+            UPDATE sessions 
+            SET end_time = CURRENT_TIMESTAMP,
+                total_time_seconds = %s,
+                active_time_seconds = %s,
+                idle_time_seconds = %s,
+                pages_visited = COALESCE(%s, (
+                    SELECT COUNT(DISTINCT page_number) FROM page_times WHERE session_id = %s
+                )),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+            RETURNING pdf_id, exercise_pdf_id, topic_id, pages_visited
+        """, (total_time_seconds, active_time_seconds, idle_time_seconds, pages_visited,
+              session_id, session_id))
+        
+        result = self.cursor.fetchone()
+        if not result:
+            logger.warning(f"Session {session_id} not found")
+            return None
+        
+        pages_visited = result['pages_visited']
+        logger.info(f"Ended session {session_id}: {total_time_seconds}s total, {pages_visited} pages")
+        return {
+            'session_id': session_id,
+            'total_time_seconds': total_time_seconds,
+            'active_time_seconds': active_time_seconds,
+            'idle_time_seconds': idle_time_seconds,
+            'pages_visited': pages_visited,
+            'pdf_id': result['pdf_id'],
+            'exercise_pdf_id': result['exercise_pdf_id'],
+            'topic_id': result['topic_id']
+        }
+
+    def save_page_times(self, rows):
+        """Save a batch of page timings in one statement and transaction
+        
+        Each row is (session_id, pdf_id, exercise_pdf_id, page_number, duration_seconds,
+        start_time, end_time) with both times as Unix timestamps.
+        """
+        if not rows:
+            return
+        
         self.connect()
         
         try:
             with self.transaction():
-                self.cursor.execute("""
+                self.cursor.execute(self.ASYNC_COMMIT_SQL)
+                execute_values(self.cursor, """
                     INSERT INTO page_times (session_id, pdf_id, exercise_pdf_id, page_number, 
-                                          duration_seconds, end_time)
-                    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                """, (session_id, pdf_id, exercise_pdf_id, page_number, duration_seconds))
+                                          duration_seconds, start_time, end_time)
+                    VALUES %s
+                """, rows, template="(%s, %s, %s, %s, %s, to_timestamp(%s), to_timestamp(%s))")
                 
-                logger.debug(f"Saved page {page_number} time: {duration_seconds}s")
+                logger.debug(f"Saved {len(rows)} page times")
                 
         except Exception as e:
-            logger.error(f"Failed to save page time: {e}")
+            logger.error(f"Failed to save page times: {e}")
             raise
 
-    def update_reading_metrics(self, pdf_id=None, exercise_pdf_id=None, topic_id=None, 
-                             pages_per_minute=0, average_time_per_page_seconds=0, 
-                             pages_read=0, time_spent_seconds=0):
-        """Update or create reading speed metrics"""
-        self.connect()
+    def _upsert_reading_metrics(self, pdf_id, exercise_pdf_id, topic_id, pages_per_minute,
+                                average_time_per_page_seconds, pages_read, time_spent_seconds):
+        """Merge one session's reading into metrics inside the caller's transaction"""
+        # Check if metrics already exist
+        self.cursor.execute("""
+            SELECT id, total_pages_read, total_time_spent_seconds 
+            FROM reading_metrics 
+            WHERE (pdf_id = %s OR pdf_id IS NULL) 
+            AND (exercise_pdf_id = %s OR exercise_pdf_id IS NULL)
+            AND (topic_id = %s OR topic_id IS NULL)
+            AND pdf_id IS NOT DISTINCT FROM %s
+            AND exercise_pdf_id IS NOT DISTINCT FROM %s
+            AND topic_id IS NOT DISTINCT FROM %s
+        """, (pdf_id, exercise_pdf_id, topic_id, pdf_id, exercise_pdf_id, topic_id))
+        
+        existing = self.cursor.fetchone()
+        
+        if existing:
+            # Update existing metrics
+            new_total_pages = existing['total_pages_read'] + pages_read
+            new_total_time = existing['total_time_spent_seconds'] + time_spent_seconds
+            
+            # Recalculate averages
+            if new_total_pages > 0:
+                new_avg_time_per_page = new_total_time / new_total_pages
+                new_pages_per_minute = new_total_pages / (new_total_time / 60.0) if new_total_time > 0 else 0
+            else:
+                new_avg_time_per_page = average_time_per_page_seconds
+                new_pages_per_minute = pages_per_minute
+            
+            self.cursor.execute("""
+                UPDATE reading_metrics 
+                SET pages_per_minute = %s,
+                    average_time_per_page_seconds = %s,
+                    total_pages_read = %s,
+                    total_time_spent_seconds = %s,
+                    last_calculated = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+            """, (new_pages_per_minute, new_avg_time_per_page, new_total_pages, 
+                  new_total_time, existing['id']))
+        else:
+            # Create new metrics
+            self.cursor.execute("""
+                INSERT INTO reading_metrics (pdf_id, exercise_pdf_id, topic_id, pages_per_minute,
+                                           average_time_per_page_seconds, total_pages_read,
+                                           total_time_spent_seconds)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (pdf_id, exercise_pdf_id, topic_id, pages_per_minute, 
+                  average_time_per_page_seconds, pages_read, time_spent_seconds))
         
-        try:
-            with self.transaction():
-                # Check if metrics already exist
-                self.cursor.execute("""
-                    SELECT id, total_pages_read, total_time_spent_seconds 
-                    FROM reading_metrics 
-                    WHERE (pdf_id = %s OR pdf_id IS NULL) 
-                    AND (exercise_pdf_id = %s OR exercise_pdf_id IS NULL)
-                    AND (topic_id = %s OR topic_id IS NULL)
-                    AND pdf_id IS NOT DISTINCT FROM %s
-                    AND exercise_pdf_id IS NOT DISTINCT FROM %s
-                    AND topic_id IS NOT DISTINCT FROM %s
-                """, (pdf_id, exercise_pdf_id, topic_id, pdf_id, exercise_pdf_id, topic_id))
-                
-                existing = self.cursor.fetchone()
-                
-                if existing:
-                    # Update existing metrics
-                    new_total_pages = existing['total_pages_read'] + pages_read
-                    new_total_time = existing['total_time_spent_seconds'] + time_spent_seconds
-                    
-                    # Recalculate averages
-                    if new_total_pages > 0:
-                        new_avg_time_per_page = new_total_time / new_total_pages
-                        new_pages_per_minute = new_total_pages / (new_total_time / 60.0) if new_total_time > 0 else 0
-                    else:
-                        new_avg_time_per_page = average_time_per_page_seconds
-                        new_pages_per_minute = pages_per_minute
-                    
-                    self.cursor.execute("""
-                        UPDATE reading_metrics 
-                        SET pages_per_minute = %s,
-                            average_time_per_page_seconds = %s,
-                            total_pages_read = %s,
-                            total_time_spent_seconds = %s,
-                            last_calculated = CURRENT_TIMESTAMP,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE id = %s
-                    """, (new_pages_per_minute, new_avg_time_per_page, new_total_pages, 
-                          new_total_time, existing['id']))
-                else:
-                    # Create new metrics
-                    self.cursor.execute("""
-                        INSERT INTO reading_metrics (pdf_id, exercise_pdf_id, topic_id, pages_per_minute,
-                                                   average_time_per_page_seconds, total_pages_read,
-                                                   total_time_spent_seconds)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """, (pdf_id, exercise_pdf_id, topic_id, pages_per_minute, 
-                          average_time_per_page_seconds, pages_read, time_spent_seconds))
-                
-                logger.debug(f"Updated reading metrics for {'exercise' if exercise_pdf_id else 'main'} PDF")
-                
-        except Exception as e:
-            logger.error(f"Failed to update reading metrics: {e}")
-            raise
+        logger.debug(f"Updated reading metrics for {'exercise' if exercise_pdf_id else 'main'} PDF")
 
     def get_reading_metrics(self, pdf_id=None, exercise_pdf_id=None, topic_id=None, user_wide=False):
         """Get reading speed metrics"""
@@ -869,6 +912,49 @@ class DatabaseManager:
             logger.error(f"Failed to get reading metrics: {e}")
             return None
 
+    def get_reading_metrics_bulk(self, pdf_id=None, exercise_pdf_id=None, topic_id=None):
+        """Get PDF-specific, topic-level and user-wide reading metrics in one query"""
+        self.connect()
+        
+        try:
+            self.cursor.execute("""
+                (SELECT 'specific' as scope, pages_per_minute, average_time_per_page_seconds,
+                        total_pages_read, total_time_spent_seconds, last_calculated
+                 FROM reading_metrics 
+                 WHERE (pdf_id = %s OR (%s IS NULL AND pdf_id IS NULL))
+                 AND (exercise_pdf_id = %s OR (%s IS NULL AND exercise_pdf_id IS NULL))
+                 AND topic_id IS NULL
+                 ORDER BY last_calculated DESC
+                 LIMIT 1)
+                UNION ALL
+                (SELECT 'topic' as scope, pages_per_minute, average_time_per_page_seconds,
+                        total_pages_read, total_time_spent_seconds, last_calculated
+                 FROM reading_metrics 
+                 WHERE pdf_id IS NULL AND exercise_pdf_id IS NULL
+                 AND topic_id = %s
+                 ORDER BY last_calculated DESC
+                 LIMIT 1)
+                UNION ALL
+                (SELECT 'user_wide' as scope,
+                        AVG(pages_per_minute),
+                        AVG(average_time_per_page_seconds),
+                        SUM(total_pages_read),
+                        SUM(total_time_spent_seconds),
+                        NULL::TIMESTAMP
+                 FROM reading_metrics
+                 WHERE total_pages_read > 0)
+            """, (pdf_id, pdf_id, exercise_pdf_id, exercise_pdf_id, topic_id))
+            
+            metrics = {}
+            for row in self.cursor.fetchall():
+                row = dict(row)
+                metrics[row.pop('scope')] = row
+            return metrics
+            
+        except Exception as e:
+            logger.error(f"Failed to get bulk reading metrics: {e}")
+            return {}
+
     def get_daily_reading_stats(self, date):
         """Get reading statistics for a specific date"""
         self.connect()
@@ -887,8 +973,8 @@ class DatabaseManager:
             logger.error(f"Failed to get daily stats for {date}: {e}")
             return None
 
-    def get_session_history(self, days=7, pdf_id=None, exercise_pdf_id=None):
-        """Get recent session history"""
+    def get_session_history(self, days=7, pdf_id=None, exercise_pdf_id=None, pdf_ids=None):
+        """Get recent session history, optionally for several PDFs at once"""
         self.connect()
         
         try:
@@ -913,6 +999,9 @@ class DatabaseManager:
             elif exercise_pdf_id:
                 base_query += " AND s.exercise_pdf_id = %s"
                 params.append(exercise_pdf_id)
+            elif pdf_ids:
+                base_query += " AND s.pdf_id = ANY(%s)"
+                params.append(list(pdf_ids))
             
             base_query += " ORDER BY s.start_time DESC"
             
@@ -925,6 +1014,27 @@ class DatabaseManager:
             logger.error(f"Failed to get session history: {e}")
             return []
 
+    def get_daily_session_totals(self, days=14):
+        """Get total session time per day for recent completed sessions"""
+        self.connect()
+        
+        try:
+            self.cursor.execute("""
+                SELECT DATE(start_time) as session_date,
+                       SUM(total_time_seconds) as total_seconds
+                FROM sessions
+                WHERE start_time >= CURRENT_DATE - INTERVAL '%s days'
+                AND end_time IS NOT NULL
+                GROUP BY DATE(start_time)
+                ORDER BY session_date
+            """, (days,))
+            
+            return [dict(row) for row in self.cursor.fetchall()]
+            
+        except Exception as e:
+            logger.error(f"Failed to get daily session totals: {e}")
+            return []
+
     def get_reading_streaks(self, days=30):
         """Get reading streak information"""
         self.connect()
@@ -945,17 +1055,37 @@ class DatabaseManager:
                     SELECT session_date, sessions_count, daily_time,
                            session_date - (ROW_NUMBER() OVER (ORDER BY session_date))::INTEGER as streak_group
                     FROM daily_sessions
+                ),
+                current_streak AS (
+                    SELECT COUNT(*) as current_streak_days,
+                           SUM(sessions_count) as streak_sessions,
+                           SUM(daily_time) as streak_total_time,
+                           MIN(session_date) as streak_start,
+                           MAX(session_date) as streak_end
+                    FROM streak_data
+                    WHERE streak_group = (
+                        SELECT streak_group FROM streak_data 
+                        WHERE session_date = (SELECT MAX(session_date) FROM daily_sessions)
+                    )
                 )
-                SELECT COUNT(*) as current_streak_days,
-                       SUM(sessions_count) as streak_sessions,
-                       SUM(daily_time) as streak_total_time,
-                       MIN(session_date) as streak_start,
-                       MAX(session_date) as streak_end
-                FROM streak_data
-                WHERE streak_group = (
-                    SELECT streak_group FROM streak_data 
-                    WHERE session_date = (SELECT MAX(session_date) FROM daily_sessions)
-                )
+                SELECT cs.*,
+                       COALESCE(ROUND(m.avg_minutes)::INTEGER, 0) as avg_minutes_per_day,
+                       CASE WHEN m.avg_minutes IS NULL THEN 'none'
+                            WHEN m.avg_minutes >= 60 THEN 'excellent'
+                            WHEN m.avg_minutes >= 30 THEN 'good'
+                            WHEN m.avg_minutes >= 15 THEN 'fair'
+                            ELSE 'minimal'
+                       END as streak_quality,
+                       CASE WHEN m.avg_minutes IS NULL THEN 'none'
+                            WHEN cs.current_streak_days >= 7 AND m.avg_minutes >= 30 THEN 'excellent'
+                            WHEN cs.current_streak_days >= 5 AND m.avg_minutes >= 20 THEN 'good'
+                            WHEN cs.current_streak_days >= 3 AND m.avg_minutes >= 15 THEN 'fair'
+                            ELSE 'poor'
+                       END as consistency_rating
+                FROM current_streak cs
+                CROSS JOIN LATERAL (
+                    SELECT cs.streak_total_time::NUMERIC / NULLIF(cs.current_streak_days, 0) / 60 as avg_minutes
+                ) m
             """, (days,))
             
             result = self.cursor.fetchone()
@@ -542,6 +542,10 @@ class MainWindow(QMainWindow):
         self.current_session_id = None
         self.session_status_label.setText("No active session")
         
+        # Session data changed reading metrics and history
+        self.reading_intelligence.clear_cache()
+        self.dashboard_widget.reload_all_stats()
+        
         if stats:
             # Show session summary
             total_time = stats.get('total_time_seconds', 0)
@@ -925,6 +929,10 @@ class MainWindow(QMainWindow):
         self.page_save_timer.stop()
         self.cleanup_timer.stop()
         
+        # Let background stats loads finish before their threads are destroyed
+        self.timer_widget.stop_background_loads()
+        self.dashboard_widget.stop_background_loads()
+        
         # Clean up temporary file
         if self.current_temp_file and os.path.exists(self.current_temp_file):
             try:
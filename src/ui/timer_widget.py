@@ -3,11 +3,14 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QProgressBar, QFrame, QGridLayout,
                             QGroupBox, QScrollArea, QTextEdit, QTabWidget,
                             QApplication, QSystemTrayIcon, QMenu)
-from PyQt6.QtCore import Qt, QTimer, pyqtSlot, QPropertyAnimation, QRect
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, pyqtSlot, QPropertyAnimation, QRect
 from PyQt6.QtGui import QFont, QPixmap, QPainter, QColor, QPen, QIcon
 from datetime import datetime, timedelta
 import logging
+import time
 from decimal import Decimal
+from database.db_manager import DatabaseManager
+from utils.session_timer import ReadingIntelligence
 
 logger = logging.getLogger(__name__)
 
@@ -203,6 +206,97 @@ class SessionStatsWidget(QWidget):
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
+class AnalyticsThread(QThread):
+    """Thread for loading analytics without blocking UI
+    
+    Each thread has its own read-only ReadingIntelligence and database connection,
+    so the GUI thread's cursor is never shared. Subclasses implement load_stats().
+    """
+    stats_loaded = pyqtSignal(dict)
+    
+    def __init__(self):
+        super().__init__()
+        self.reading_intelligence = ReadingIntelligence(DatabaseManager(read_only=True))
+        self.cache_stale = False  # Drop cached analytics before the next load
+        self.rerun_requested = False  # A load was requested while one was running
+        self.finished.connect(self.on_finished)
+        
+    def load(self, skip_cache=False):
+        """Start a load, or run one more once the current load finishes"""
+        if skip_cache:
+            self.cache_stale = True
+        
+        if self.isRunning():
+            self.rerun_requested = True
+            return
+        
+        # The cache is only touched while the thread is stopped, so a load in
+        # flight cannot write older results back after it is cleared
+        if self.cache_stale:
+            self.reading_intelligence.clear_cache()
+            self.cache_stale = False
+            
+        self.start()
+        
+    @pyqtSlot()
+    def on_finished(self):
+        """Start a load that was requested while the previous one was running"""
+        if self.rerun_requested:
+            self.rerun_requested = False
+            self.wait()  # finished is emitted just before run() returns
+            self.load()
+            
+    def stop(self):
+        """Wait for a running load and close the thread's database connection"""
+        self.rerun_requested = False
+        self.wait()
+        self.reading_intelligence.db_manager.disconnect()
+        
+    def run(self):
+        try:
+            stats = self.load_stats()
+        except Exception as e:
+            logger.error(f"Error loading {type(self).__name__} analytics: {e}")
+            return
+            
+        self.stats_loaded.emit(stats)
+        
+    def load_stats(self):
+        """Return the analytics dict emitted with stats_loaded"""
+        raise NotImplementedError
+
+
+class DailyStatsThread(AnalyticsThread):
+    """Thread for loading daily and streak analytics"""
+    
+    def load_stats(self):
+        return {
+            'daily_stats': self.reading_intelligence.get_daily_stats(),
+            'streaks': self.reading_intelligence.get_streak_analytics()
+        }
+
+
+class DashboardStatsThread(AnalyticsThread):
+    """Thread for loading dashboard analytics"""
+    
+    def load_stats(self):
+        week_history = self.reading_intelligence.get_session_history(days=7)
+        
+        # Recent activity covers the last 3 days, a subset of the week's rows
+        recent_since = datetime.now().date() - timedelta(days=3)
+        recent_history = [
+            session for session in week_history
+            if session['start_time'].date() >= recent_since
+        ]
+        
+        return {
+            'speed_metrics': self.reading_intelligence.get_reading_speed(user_wide=True),
+            'week_history': week_history,
+            'recent_history': recent_history,
+            'streaks': self.reading_intelligence.get_streak_analytics()
+        }
+
+
 class TimerWidget(QWidget):
     """Enhanced timer widget with comprehensive session tracking"""
     
@@ -210,7 +304,9 @@ class TimerWidget(QWidget):
         super().__init__()
         self.session_timer = None
         self.reading_intelligence = None
+        self.daily_stats_thread = None
         self.current_session_stats = None
+        self.stats_received_at = None
         self.current_pdf_info = None
         self.floating_overlay = None
         self.notification_sounds = True
@@ -498,6 +594,10 @@ class TimerWidget(QWidget):
         """Set the reading intelligence instance"""
         self.reading_intelligence = reading_intelligence
         
+        # Daily analytics load on a worker thread
+        self.daily_stats_thread = DailyStatsThread()
+        self.daily_stats_thread.stats_loaded.connect(self.on_daily_stats_loaded)
+        
     def set_current_pdf_info(self, pdf_info, is_exercise=False):
         """Set current PDF information with enhanced tracking"""
         self.current_pdf_info = pdf_info
@@ -669,13 +769,23 @@ class TimerWidget(QWidget):
         self.confidence_label.setText("-")
         self.insights_text.setText("Start reading to see insights...")
         
-    def update_daily_stats(self):
-        """Update daily statistics display"""
-        if not self.reading_intelligence:
-            return
+    def update_daily_stats(self, skip_cache=False):
+        """Load daily statistics in the background; the display updates when they arrive"""
+        if self.daily_stats_thread:
+            self.daily_stats_thread.load(skip_cache=skip_cache)
             
+    def stop_background_loads(self):
+        """Stop refreshing and wait for a running stats load"""
+        self.ui_timer.stop()
+        if self.daily_stats_thread:
+            self.daily_stats_thread.stop()
+        
+    @pyqtSlot(dict)
+    def on_daily_stats_loaded(self, daily_analytics):
+        """Update daily statistics display"""
+        stats = daily_analytics['daily_stats']
+        streak_data = daily_analytics['streaks']
         try:
-            stats = self.reading_intelligence.get_daily_stats()
             if stats:
                 # Daily time goal progress
                 goal_progress = stats.get('daily_goal_progress', {})
@@ -694,8 +804,7 @@ class TimerWidget(QWidget):
                 self.daily_sessions_label.setText(f"Sessions today: {sessions_count}")
                 self.daily_pages_label.setText(f"Pages today: {total_pages}")
                 
-            # Get streak info
-            streak_data = self.reading_intelligence.get_streak_analytics()
+            # Streak info
             if streak_data:
                 current_streak = streak_data.get('current_streak_days', 0)
                 streak_quality = streak_data.get('streak_quality', 'none')
@@ -728,7 +837,32 @@ class TimerWidget(QWidget):
             active_time = self.current_session_stats.get('active_time_seconds', 0)
             idle_time = self.current_session_stats.get('idle_time_seconds', 0)
             pages_visited = self.current_session_stats.get('pages_visited', 0)
-            reading_speed = self.current_session_stats.get('reading_speed_ppm', 0)
+            
+            # Stats arrive on state changes only, so advance the clocks locally
+            since_update = int(time.monotonic() - self.stats_received_at)
+            total_time += since_update
+            if self.current_session_stats.get('is_idle'):
+                idle_time += since_update
+            else:
+                active_time += since_update
+            
+            # Speed follows the advanced active time
+            if active_time > 0 and pages_visited > 0:
+                reading_speed = pages_visited / (active_time / 60.0)
+                avg_time_per_page = active_time / pages_visited
+            else:
+                reading_speed = 0
+                avg_time_per_page = 0
+            
+            if self.tab_widget.currentWidget() is self.stats_widget:
+                self.stats_widget.update_stats({
+                    **self.current_session_stats,
+                    'total_time_seconds': total_time,
+                    'active_time_seconds': active_time,
+                    'idle_time_seconds': idle_time,
+                    'reading_speed_ppm': reading_speed,
+                    'avg_time_per_page': avg_time_per_page
+                })
             
             # Update main time display
             time_str = self.format_duration(total_time)
@@ -749,14 +883,14 @@ class TimerWidget(QWidget):
                     f"{pages_visited} pages"
                 )
         
-        # Update daily stats periodically (every 30 seconds)
+        # Update daily stats periodically (every 30 seconds, on the monotonic clock)
         if hasattr(self, '_last_daily_update'):
-            if (datetime.now() - self._last_daily_update).seconds > 30:
+            if time.monotonic() - self._last_daily_update > 30:
                 self.update_daily_stats()
-                self._last_daily_update = datetime.now()
+                self._last_daily_update = time.monotonic()
         else:
             self.update_daily_stats()
-            self._last_daily_update = datetime.now()
+            self._last_daily_update = time.monotonic()
     
     def toggle_pause_resume(self):
         """Toggle pause/resume session with enhanced feedback"""
@@ -833,10 +967,11 @@ class TimerWidget(QWidget):
         
         # Reset session stats
         self.current_session_stats = None
+        self.stats_received_at = None
         self.stats_widget.reset_display()
         
-        # Update daily stats after session ends
-        self.update_daily_stats()
+        # Update daily stats after session ends, skipping cached analytics
+        self.update_daily_stats(skip_cache=True)
         
         # Show session summary
         if stats:
@@ -875,6 +1010,7 @@ class TimerWidget(QWidget):
     def on_stats_updated(self, stats):
         """Handle comprehensive stats updates"""
         self.current_session_stats = stats
+        self.stats_received_at = time.monotonic()
         
         # Update detailed stats widget
         self.stats_widget.update_stats(stats)
@@ -909,6 +1045,7 @@ class StudyDashboardWidget(QWidget):
         super().__init__()
         self.db_manager = db_manager
         self.reading_intelligence = None
+        self.stats_thread = None
         
         # Update timer
         self.update_timer = QTimer()
@@ -1024,7 +1161,7 @@ class StudyDashboardWidget(QWidget):
         
         # Refresh button
         refresh_btn = QPushButton("🔄 Refresh Statistics")
-        refresh_btn.clicked.connect(self.refresh_all_stats)
+        refresh_btn.clicked.connect(self.reload_all_stats)
         scroll_layout.addWidget(refresh_btn)
         
         scroll_layout.addStretch()
@@ -1086,25 +1223,43 @@ class StudyDashboardWidget(QWidget):
     def set_reading_intelligence(self, reading_intelligence):
         """Set the reading intelligence instance"""
         self.reading_intelligence = reading_intelligence
+        
+        # Dashboard queries run on a worker thread
+        self.stats_thread = DashboardStatsThread()
+        self.stats_thread.stats_loaded.connect(self.on_stats_loaded)
         self.refresh_all_stats()
         
     def refresh_all_stats(self):
+        """Load all statistics in the background; the displays update when they arrive"""
+        if self.stats_thread:
+            self.stats_thread.load()
+            
+    def reload_all_stats(self):
+        """Reload all statistics, skipping cached analytics (manual refresh, session end)"""
+        if self.stats_thread:
+            self.stats_thread.load(skip_cache=True)
+        
+    def stop_background_loads(self):
+        """Stop refreshing and wait for a running stats load"""
+        self.update_timer.stop()
+        if self.stats_thread:
+            self.stats_thread.stop()
+        
+    @pyqtSlot(dict)
+    def on_stats_loaded(self, dashboard_stats):
         """Refresh all statistics displays"""
         try:
-            self.update_overview_stats()
-            self.update_week_stats()
-            self.update_speed_stats()
-            self.update_streak_stats()
-            self.update_recent_activity()
+            self.update_overview_stats(dashboard_stats['speed_metrics'])
+            self.update_week_stats(dashboard_stats['week_history'])
+            self.update_speed_stats(dashboard_stats['speed_metrics'])
+            self.update_streak_stats(dashboard_stats['streaks'])
+            self.update_recent_activity(dashboard_stats['recent_history'])
         except Exception as e:
             logger.error(f"Error refreshing dashboard stats: {e}")
             
-    def update_overview_stats(self):
+    def update_overview_stats(self, metrics):
         """Update overview statistics"""
         try:
-            # Get overall metrics
-            metrics = self.reading_intelligence.get_reading_speed(user_wide=True) if self.reading_intelligence else None
-            
             if metrics:
                 total_time = self.safe_float(metrics.get('total_time_spent_seconds', 0))
                 total_pages = metrics.get('total_pages_read', 0) or 0
@@ -1126,60 +1281,43 @@ class StudyDashboardWidget(QWidget):
         except Exception as e:
             logger.error(f"Error updating overview stats: {e}")
             
-    def update_week_stats(self):
+    def update_week_stats(self, history):
         """Update this week's statistics"""
         try:
-            # Get week's session history
-            if self.reading_intelligence:
-                history = self.reading_intelligence.get_session_history(days=7)
+            if history:
+                week_sessions = len(history)
+                week_time = sum(self.safe_float(session.get('total_time_seconds', 0)) for session in history)
+                week_pages = sum(session.get('pages_visited', 0) or 0 for session in history)
+                daily_avg = week_time / 7 if week_time > 0 else 0
                 
-                if history:
-                    week_sessions = len(history)
-                    week_time = sum(self.safe_float(session.get('total_time_seconds', 0)) for session in history)
-                    week_pages = sum(session.get('pages_visited', 0) or 0 for session in history)
-                    daily_avg = week_time / 7 if week_time > 0 else 0
-                    
-                    self.week_sessions_label.setText(f"Sessions: {week_sessions}")
-                    self.week_time_label.setText(f"Study Time: {self.format_duration(int(week_time))}")
-                    self.week_pages_label.setText(f"Pages Read: {week_pages}")
-                    self.week_avg_label.setText(f"Daily Avg: {self.format_duration(int(daily_avg))}")
-                else:
-                    self.week_sessions_label.setText("Sessions: 0")
-                    self.week_time_label.setText("Study Time: 00:00:00")
-                    self.week_pages_label.setText("Pages Read: 0")
-                    self.week_avg_label.setText("Daily Avg: 00:00:00")
+                self.week_sessions_label.setText(f"Sessions: {week_sessions}")
+                self.week_time_label.setText(f"Study Time: {self.format_duration(int(week_time))}")
+                self.week_pages_label.setText(f"Pages Read: {week_pages}")
+                self.week_avg_label.setText(f"Daily Avg: {self.format_duration(int(daily_avg))}")
             else:
-                self.week_sessions_label.setText("Sessions: No data")
-                self.week_time_label.setText("Study Time: No data")
-                self.week_pages_label.setText("Pages Read: No data")
-                self.week_avg_label.setText("Daily Avg: No data")
+                self.week_sessions_label.setText("Sessions: 0")
+                self.week_time_label.setText("Study Time: 00:00:00")
+                self.week_pages_label.setText("Pages Read: 0")
+                self.week_avg_label.setText("Daily Avg: 00:00:00")
                 
         except Exception as e:
             logger.error(f"Error updating week stats: {e}")
             
-    def update_speed_stats(self):
+    def update_speed_stats(self, metrics):
         """Update reading speed statistics"""
         try:
-            if self.reading_intelligence:
-                metrics = self.reading_intelligence.get_reading_speed(user_wide=True)
+            if metrics:
+                speed = self.safe_float(metrics.get('pages_per_minute', 0))
                 
-                if metrics:
-                    speed = self.safe_float(metrics.get('pages_per_minute', 0))
-                    
-                    self.overall_speed_label.setText(f"Overall Speed: {speed:.2f} pages/min")
-                    
-                    # Calculate efficiency (placeholder)
-                    efficiency = 85  # Placeholder
-                    self.efficiency_label.setText(f"Efficiency: {efficiency}%")
-                    
-                    # Placeholder values for best speed and consistency
-                    self.best_speed_label.setText(f"Best Speed: {speed * 1.3:.2f} pages/min")
-                    self.consistency_label.setText("Consistency: Good")
-                else:
-                    self.overall_speed_label.setText("Overall Speed: No data")
-                    self.best_speed_label.setText("Best Speed: No data")
-                    self.efficiency_label.setText("Efficiency: No data")
-                    self.consistency_label.setText("Consistency: No data")
+                self.overall_speed_label.setText(f"Overall Speed: {speed:.2f} pages/min")
+                
+                # Calculate efficiency (placeholder)
+                efficiency = 85  # Placeholder
+                self.efficiency_label.setText(f"Efficiency: {efficiency}%")
+                
+                # Placeholder values for best speed and consistency
+                self.best_speed_label.setText(f"Best Speed: {speed * 1.3:.2f} pages/min")
+                self.consistency_label.setText("Consistency: Good")
             else:
                 self.overall_speed_label.setText("Overall Speed: No data")
                 self.best_speed_label.setText("Best Speed: No data")
@@ -1189,12 +1327,9 @@ class StudyDashboardWidget(QWidget):
         except Exception as e:
             logger.error(f"Error updating speed stats: {e}")
             
-    def update_streak_stats(self):
+    def update_streak_stats(self, streaks):
         """Update study streak statistics"""
         try:
-            # Get reading streaks
-            streaks = self.db_manager.get_reading_streaks() if hasattr(self.db_manager, 'get_reading_streaks') else None
-            
             if streaks:
                 current_streak = streaks.get('current_streak_days', 0) or 0
                 streak_sessions = streaks.get('streak_sessions', 0) or 0
@@ -1213,45 +1348,40 @@ class StudyDashboardWidget(QWidget):
         except Exception as e:
             logger.error(f"Error updating streak stats: {e}")
             
-    def update_recent_activity(self):
+    def update_recent_activity(self, history):
         """Update recent activity display"""
         try:
-            if self.reading_intelligence:
-                history = self.reading_intelligence.get_session_history(days=3)
-                
-                if history:
-                    activity_text = "Recent Sessions:\n"
-                    for session in history[:5]:  # Show last 5 sessions
-                        title = session.get('pdf_title') or session.get('exercise_title', 'Unknown')
-                        duration = self.format_duration(int(self.safe_float(session.get('total_time_seconds', 0))))
-                        pages = session.get('pages_visited', 0) or 0
-                        start_time = session.get('start_time', '')
-                        
-                        if start_time:
-                            try:
-                                if isinstance(start_time, str):
-                                    try:
-                                        start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                                    except:
-                                        start_dt = datetime.now()
-                                elif hasattr(start_time, 'strftime'):
-                                    start_dt = start_time
-                                else:
+            if history:
+                activity_text = "Recent Sessions:\n"
+                for session in history[:5]:  # Show last 5 sessions
+                    title = session.get('pdf_title') or session.get('exercise_title', 'Unknown')
+                    duration = self.format_duration(int(self.safe_float(session.get('total_time_seconds', 0))))
+                    pages = session.get('pages_visited', 0) or 0
+                    start_time = session.get('start_time', '')
+                    
+                    if start_time:
+                        try:
+                            if isinstance(start_time, str):
+                                try:
+                                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+                                except:
                                     start_dt = datetime.now()
-                                time_str = start_dt.strftime("%m/%d %H:%M")
-                            except:
-                                time_str = "Unknown time"
-                        else:
+                            elif hasattr(start_time, 'strftime'):
+                                start_dt = start_time
+                            else:
+                                start_dt = datetime.now()
+                            time_str = start_dt.strftime("%m/%d %H:%M")
+                        except:
                             time_str = "Unknown time"
-                        
-                        activity_text += f"• {time_str}: {title[:30]}{'...' if len(title) > 30 else ''}\n"
-                        activity_text += f"  {duration}, {pages} pages\n\n"
+                    else:
+                        time_str = "Unknown time"
                     
-                    self.recent_activity_label.setText(activity_text.strip())
-                else:
-                    self.recent_activity_label.setText("No recent activity found.")
+                    activity_text += f"• {time_str}: {title[:30]}{'...' if len(title) > 30 else ''}\n"
+                    activity_text += f"  {duration}, {pages} pages\n\n"
+                
+                self.recent_activity_label.setText(activity_text.strip())
             else:
-                self.recent_activity_label.setText("Reading intelligence not available.")
+                self.recent_activity_label.setText("No recent activity found.")
                 
         except Exception as e:
             logger.error(f"Error updating recent activity: {e}")
@@ -1,13 +1,165 @@
 # src/utils/session_timer.py - Enhanced Version
 import time
+from array import array
 from datetime import datetime, timedelta
 from PyQt6.QtCore import QObject, QTimer, QElapsedTimer, pyqtSignal, QCoreApplication
-from PyQt6.QtWidgets import QApplication
 import logging
-import json
+import psycopg2
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class SessionStats:
+    """Live statistics for the active session, updated in place"""
+    session_id: int
+    pdf_id: Optional[int]
+    exercise_pdf_id: Optional[int]
+    topic_id: Optional[int]
+    is_exercise: bool
+    session_start_time: Optional[str]  # ISO string, formatted once per session
+    total_time_seconds: int = 0
+    active_time_seconds: int = 0
+    idle_time_seconds: int = 0
+    pages_visited: int = 0
+    current_page: int = 1
+    is_idle: bool = False
+    is_manually_paused: bool = False
+    page_visit_count: int = 0
+    
+    @property
+    def reading_speed_ppm(self):
+        """Pages per minute of active time, computed on access"""
+        if self.active_time_seconds > 0 and self.pages_visited > 0:
+            return self.pages_visited / (self.active_time_seconds / 60.0)
+        return 0
+    
+    @property
+    def avg_time_per_page(self):
+        """Active seconds per visited page, computed on access"""
+        if self.active_time_seconds > 0 and self.pages_visited > 0:
+            return self.active_time_seconds / self.pages_visited
+        return 0
+    
+    def to_dict(self):
+        """Snapshot for signal emission and external callers"""
+        return {
+            'session_id': self.session_id,
+            'pdf_id': self.pdf_id,
+            'exercise_pdf_id': self.exercise_pdf_id,
+            'topic_id': self.topic_id,
+            'is_exercise': self.is_exercise,
+            'total_time_seconds': self.total_time_seconds,
+            'active_time_seconds': self.active_time_seconds,
+            'idle_time_seconds': self.idle_time_seconds,
+            'pages_visited': self.pages_visited,
+            'current_page': self.current_page,
+            'is_idle': self.is_idle,
+            'is_manually_paused': self.is_manually_paused,
+            'reading_speed_ppm': self.reading_speed_ppm,
+            'avg_time_per_page': self.avg_time_per_page,
+            'session_start_time': self.session_start_time,
+            'page_visit_count': self.page_visit_count
+        }
+
+
+class PageVisitLog:
+    """Fixed-capacity ring buffer of page visits stored as parallel arrays"""
+    
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._pages = array('I', [0]) * capacity
+        self._start_times = array('d', [0.0]) * capacity
+        self._end_times = array('d', [0.0]) * capacity
+        self._durations = array('I', [0]) * capacity
+        self._session_ids = array('q', [0]) * capacity
+        self._head = 0
+        self._count = 0
+    
+    def append(self, page, start_time, end_time, duration_seconds, session_id):
+        """Record a visit, overwriting the oldest one when full"""
+        head = self._head
+        self._pages[head] = page
+        self._start_times[head] = start_time
+        self._end_times[head] = end_time
+        self._durations[head] = duration_seconds
+        self._session_ids[head] = session_id
+        
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+    
+    def clear(self):
+        self._head = 0
+        self._count = 0
+    
+    def to_list(self):
+        """Copy the visits out, oldest first"""
+        return list(self)
+    
+    def __len__(self):
+        return self._count
+    
+    def __iter__(self):
+        start = (self._head - self._count) % self.capacity
+        for offset in range(self._count):
+            index = (start + offset) % self.capacity
+            yield {
+                'page': self._pages[index],
+                'start_time': self._start_times[index],
+                'end_time': self._end_times[index],
+                'duration_seconds': self._durations[index],
+                'session_id': self._session_ids[index]
+            }
+
+
+class VisitedPages:
+    """Set of visited page numbers, kept as an int bitmap for typical PDFs"""
+    
+    BITMAP_LIMIT = 4096
+    
+    def __init__(self):
+        self._bitmap = 0
+        self._overflow = None
+    
+    def add(self, page):
+        if self._overflow is not None:
+            self._overflow.add(page)
+        elif 0 <= page < self.BITMAP_LIMIT:
+            self._bitmap |= 1 << page
+        else:
+            # Very large documents fall back to a plain set
+            self._overflow = set(self)
+            self._overflow.add(page)
+    
+    def clear(self):
+        self._bitmap = 0
+        self._overflow = None
+    
+    def __len__(self):
+        if self._overflow is not None:
+            return len(self._overflow)
+        return self._bitmap.bit_count()
+    
+    def __contains__(self, page):
+        if self._overflow is not None:
+            return page in self._overflow
+        return 0 <= page < self.BITMAP_LIMIT and bool(self._bitmap >> page & 1)
+    
+    def __iter__(self):
+        if self._overflow is not None:
+            yield from self._overflow
+            return
+        
+        bitmap = self._bitmap
+        while bitmap:
+            low_bit = bitmap & -bitmap
+            yield low_bit.bit_length() - 1
+            bitmap ^= low_bit
+
+
 class SessionTimer(QObject):
     """Enhanced reading session tracker with comprehensive timing and analytics"""
     
@@ -33,38 +185,60 @@ class SessionTimer(QObject):
         self.topic_id = None
         self.is_exercise = False
         self.session_start_time = None
+        self._stats = None
         
         # Timing mechanisms
         self.session_timer = QElapsedTimer()
         self.page_timer = QElapsedTimer()
         self.idle_start_timer = QElapsedTimer()
         
-        # Page tracking
+        # Page tracking; a page counts as visited once a visit to it is recorded,
+        # matching the page_times rows the session's final count comes from
         self.current_page = 1
         self.previous_page = 1
-        self.pages_visited = set()
-        self.page_visit_log = []  # [(page, start_time, end_time, duration)]
+        self.pages_visited = VisitedPages()
+        self.page_visit_log = PageVisitLog(capacity=1000)
         self.page_start_time = None
+        self.min_page_visit_ms = 2000  # Shorter visits are not recorded
+        
+        # Emit stats when the current page becomes countable, so the live page
+        # count does not wait for the next heartbeat
+        self.page_count_timer = QTimer()
+        self.page_count_timer.setSingleShot(True)
+        self.page_count_timer.timeout.connect(self._emit_stats_update)
+        
+        # Page timings are written to page_times in batches, and also when the
+        # session goes idle or on the heartbeat; rows stay queued if a write fails
+        self.pending_page_times = []
+        self.page_time_batch_size = 20
         
-        # Idle detection
+        # Debounce rapid page changes (e.g. scrolling past several pages)
+        self.page_change_debounce_ms = 250
+        self.pending_page = None
+        self.page_change_timer = QTimer()
+        self.page_change_timer.setSingleShot(True)
+        self.page_change_timer.timeout.connect(self._commit_page_change)
+        
+        # Idle detection: a single-shot timer restarted on every activity
         self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
         self.idle_timer.timeout.connect(self._check_idle_timeout)
         self.idle_threshold_ms = 120000  # 2 minutes
         self.last_activity_time = QElapsedTimer()
+        self.activity_throttle_ms = 100  # Coalesce bursts of interactions
         self.is_idle = False
         self.is_manually_paused = False
-        self.total_idle_time = 0
-        self.current_idle_duration = 0
+        self.total_idle_ms = 0  # Idle bookkeeping stays in QElapsedTimer milliseconds
         
         # Activity detection
         self.activity_timer = QTimer()
         self.activity_timer.timeout.connect(self._record_heartbeat)
         self.activity_timer.start(30000)  # Heartbeat every 30 seconds
         
-        # Stats update timer
+        # Stats are emitted on state changes; this is only a low-frequency heartbeat
         self.stats_timer = QTimer()
         self.stats_timer.timeout.connect(self._emit_stats_update)
-        self.stats_timer.start(3000)  # Update stats every 3 seconds
+        self.stats_timer.start(30000)
         
         # Reading speed calculation timer
         self.speed_timer = QTimer()
@@ -97,6 +271,14 @@ class SessionTimer(QObject):
             
             # Initialize timing
             self.session_start_time = datetime.now()
+            self._stats = SessionStats(
+                session_id=self.current_session_id,
+                pdf_id=pdf_id,
+                exercise_pdf_id=exercise_pdf_id,
+                topic_id=topic_id,
+                is_exercise=self.is_exercise,
+                session_start_time=self.session_start_time.isoformat()
+            )
             self.session_timer.start()
             self.last_activity_time.start()
             
@@ -105,18 +287,19 @@ class SessionTimer(QObject):
             self.page_visit_log.clear()
             self.current_page = 1
             self.previous_page = 1
-            self.total_idle_time = 0
-            self.current_idle_duration = 0
+            self.total_idle_ms = 0
             self.is_idle = False
             self.is_manually_paused = False
             self.page_start_time = time.time()
             
             # Start monitoring
-            self.idle_timer.start(1000)  # Check every second
+            self.idle_timer.start(self.idle_threshold_ms)
             self.page_timer.start()
+            self._arm_page_count_timer()
             
             logger.info(f"📖 Started session {self.current_session_id} for {'exercise' if self.is_exercise else 'main'} PDF {pdf_id or exercise_pdf_id}")
             self.session_started.emit(self.current_session_id)
+            self._emit_stats_update()
             
             return self.current_session_id
             
@@ -133,46 +316,60 @@ class SessionTimer(QObject):
             # Stop all timers
             self.idle_timer.stop()
             
-            # Save final page time if active
+            # Apply any page change still waiting on the debounce
+            if self.page_change_timer.isActive():
+                self.page_change_timer.stop()
+                self._commit_page_change()
+            
+            # Save final page time if active; page counts below read page_times
             if self.page_timer.isValid() and not self.is_idle:
                 self._save_current_page_time()
+            page_times_saved = self._flush_page_times()
             
             # Calculate comprehensive session stats
-            total_elapsed_ms = self.session_timer.elapsed()
-            total_time_seconds = total_elapsed_ms // 1000
+            total_time_seconds = self.session_timer.elapsed() // 1000
             
-            # Calculate idle time properly
+            # Include an idle period still in progress
             if self.is_idle and self.idle_start_timer.isValid():
-                self.current_idle_duration = self.idle_start_timer.elapsed() // 1000
-                self.total_idle_time += self.current_idle_duration
+                self.total_idle_ms += self.idle_start_timer.elapsed()
             
-            active_time_seconds = max(0, total_time_seconds - self.total_idle_time)
-            pages_count = len(self.pages_visited)
+            idle_time_seconds = self.total_idle_ms // 1000
+            active_time_seconds = max(0, total_time_seconds - idle_time_seconds)
             
-            # Update session in database
-            session_stats = self.db_manager.end_session(
+            # Close the session and update reading metrics in one transaction;
+            # pages visited are counted from page_times unless some timings
+            # could not be written, in which case the local count is used
+            session_stats = self.db_manager.finalize_session(
                 session_id=self.current_session_id,
                 total_time_seconds=total_time_seconds,
                 active_time_seconds=active_time_seconds,
-                idle_time_seconds=self.total_idle_time,
-                pages_visited=pages_count
+                idle_time_seconds=idle_time_seconds,
+                pages_visited=None if page_times_saved else len(self.pages_visited)
             )
+            pages_count = session_stats['pages_visited'] if session_stats else len(self.pages_visited)
             
-            # Calculate and update reading metrics
+            # Calculate final reading metrics for the session summary
             reading_metrics = self._calculate_final_reading_metrics(
                 active_time_seconds, pages_count
             )
-            
-            # Save comprehensive session metadata
-            self._save_session_metadata(session_stats, reading_metrics)
+            if session_stats and reading_metrics:
+                logger.info(f"📊 Final reading speed: {reading_metrics['final_reading_speed_ppm']:.2f} PPM")
             
             logger.info(f"✅ Ended session {self.current_session_id}: {total_time_seconds}s total, {active_time_seconds}s active, {pages_count} pages")
             
             session_id = self.current_session_id
+            # The database row already carries the session totals; fall back
+            # to the locally measured ones if the session could not be found
             final_stats = {
-                **(session_stats or {}),
+                **(session_stats or {
+                    'session_id': session_id,
+                    'total_time_seconds': total_time_seconds,
+                    'active_time_seconds': active_time_seconds,
+                    'idle_time_seconds': idle_time_seconds,
+                    'pages_visited': pages_count
+                }),
                 **reading_metrics,
-                'page_visit_log': self.page_visit_log.copy()
+                'page_visit_log': self.page_visit_log.to_list()
             }
             
             self.session_ended.emit(session_id, final_stats)
@@ -187,9 +384,24 @@ class SessionTimer(QObject):
             return None
     
     def change_page(self, new_page):
-        """Enhanced page change handling with detailed timing"""
+        """Queue a page change; rapid successive changes count as one transition"""
         if not self.current_session_id:
             return
+        
+        # Same page with nothing queued is just activity
+        if self.pending_page is None and new_page == self.current_page:
+            self._record_activity()
+            return
+        
+        self.pending_page = new_page
+        self.page_change_timer.start(self.page_change_debounce_ms)
+    
+    def _commit_page_change(self):
+        """Apply the queued page change with detailed timing"""
+        new_page = self.pending_page
+        self.pending_page = None
+        if not self.current_session_id or new_page is None:
+            return
             
         try:
             old_page = self.current_page
@@ -206,17 +418,18 @@ class SessionTimer(QObject):
             # Update page state
             self.previous_page = old_page
             self.current_page = new_page
-            self.pages_visited.add(new_page)
             
             # Start timing for new page
             self.page_start_time = time.time()
             self.page_timer.restart()
+            self._arm_page_count_timer()
             
             # Record activity
             self._record_activity()
             
             # Emit signals
             self.page_changed.emit(self.current_session_id, old_page, new_page)
+            self._emit_stats_update()
             
             # Update reading speed estimate
             self._calculate_reading_speed()
@@ -247,8 +460,8 @@ class SessionTimer(QObject):
         if not self.current_session_id or self.is_idle:
             return
             
-        self._set_idle_state(True, manual=manual)
         self.is_manually_paused = manual
+        self._set_idle_state(True, manual=manual)
         
         if manual:
             logger.info(f"⏸️ Session {self.current_session_id} manually paused")
@@ -260,65 +473,64 @@ class SessionTimer(QObject):
         if not self.current_session_id or not self.is_idle:
             return
             
-        self._record_activity()
         self.is_manually_paused = False
+        self._record_activity()
         
         logger.info(f"▶️ Session {self.current_session_id} resumed")
         self.session_resumed.emit(self.current_session_id)
     
     def get_current_stats(self):
         """Get comprehensive current session statistics"""
-        if not self.current_session_id:
+        stats = self._refresh_stats()
+        if stats is None:
+            return None
+        
+        current_stats = stats.to_dict()
+        current_stats['unique_pages_visited'] = list(self.pages_visited)
+        return current_stats
+    
+    def _refresh_stats(self):
+        """Update the live SessionStats in place and return it"""
+        stats = self._stats
+        if not self.current_session_id or stats is None:
             return None
             
         total_elapsed = self.session_timer.elapsed() // 1000
         
-        # Calculate current idle time
-        current_idle = 0
+        # Include the current idle period, converting to seconds once
+        idle_ms = self.total_idle_ms
         if self.is_idle and self.idle_start_timer.isValid():
-            current_idle = self.idle_start_timer.elapsed() // 1000
+            idle_ms += self.idle_start_timer.elapsed()
         
-        total_idle = self.total_idle_time + current_idle
-        active_time = max(0, total_elapsed - total_idle)
-        pages_count = len(self.pages_visited)
+        total_idle = idle_ms // 1000
         
-        # Calculate reading speed
-        reading_speed = 0
-        avg_time_per_page = 0
-        if active_time > 0 and pages_count > 0:
-            reading_speed = (pages_count / (active_time / 60.0))  # pages per minute
-            avg_time_per_page = active_time / pages_count
+        # Count the current page as the session end would: once it has been
+        # on screen long enough to be recorded
+        pages_visited = len(self.pages_visited)
+        if (self.current_page not in self.pages_visited and self.page_timer.isValid()
+                and self.page_timer.elapsed() >= self.min_page_visit_ms):
+            pages_visited += 1
         
-        return {
-            'session_id': self.current_session_id,
-            'pdf_id': self.pdf_id,
-            'exercise_pdf_id': self.exercise_pdf_id,
-            'topic_id': self.topic_id,
-            'is_exercise': self.is_exercise,
-            'total_time_seconds': total_elapsed,
-            'active_time_seconds': active_time,
-            'idle_time_seconds': total_idle,
-            'pages_visited': pages_count,
-            'current_page': self.current_page,
-            'is_idle': self.is_idle,
-            'is_manually_paused': self.is_manually_paused,
-            'reading_speed_ppm': reading_speed,
-            'avg_time_per_page': avg_time_per_page,
-            'session_start_time': self.session_start_time.isoformat() if self.session_start_time else None,
-            'unique_pages_visited': list(self.pages_visited),
-            'page_visit_count': len(self.page_visit_log)
-        }
+        # Reading speed and time per page are derived on access
+        stats.total_time_seconds = total_elapsed
+        stats.active_time_seconds = max(0, total_elapsed - total_idle)
+        stats.idle_time_seconds = total_idle
+        stats.pages_visited = pages_visited
+        stats.current_page = self.current_page
+        stats.is_idle = self.is_idle
+        stats.is_manually_paused = self.is_manually_paused
+        stats.page_visit_count = len(self.page_visit_log)
+        return stats
     
     def get_session_summary(self):
         """Get a formatted session summary for display"""
-        stats = self.get_current_stats()
+        stats = self._refresh_stats()
         if not stats:
             return "No active session"
         
-        total_time = stats['total_time_seconds']
-        active_time = stats['active_time_seconds']
-        pages = stats['pages_visited']
-        speed = stats['reading_speed_ppm']
+        total_time = stats.total_time_seconds
+        pages = stats.pages_visited
+        speed = stats.reading_speed_ppm
         
         hours = total_time // 3600
         minutes = (total_time % 3600) // 60
@@ -342,68 +554,94 @@ class SessionTimer(QObject):
             duration_ms = self.page_timer.elapsed()
             duration_seconds = duration_ms // 1000
             
-            # Only save if meaningful time spent (> 2 seconds)
-            if duration_seconds >= 2:
+            # Only save if meaningful time spent (2 seconds or more)
+            if duration_ms >= self.min_page_visit_ms:
                 end_time = time.time()
                 
                 # Add to visit log
-                visit_record = {
-                    'page': self.current_page,
-                    'start_time': self.page_start_time,
-                    'end_time': end_time,
-                    'duration_seconds': duration_seconds,
-                    'session_id': self.current_session_id
-                }
-                self.page_visit_log.append(visit_record)
-                
-                # Save to database
-                self.db_manager.save_page_time(
-                    session_id=self.current_session_id,
-                    pdf_id=self.pdf_id,
-                    exercise_pdf_id=self.exercise_pdf_id,
-                    page_number=self.current_page,
-                    duration_seconds=duration_seconds
+                self.pages_visited.add(self.current_page)
+                self.page_visit_log.append(
+                    self.current_page,
+                    self.page_start_time,
+                    end_time,
+                    duration_seconds,
+                    self.current_session_id
                 )
                 
-                logger.debug(f"💾 Saved page {self.current_page} time: {duration_seconds}s")
+                # Queue for the next batched database write
+                self.pending_page_times.append((
+                    self.current_session_id,
+                    self.pdf_id,
+                    self.exercise_pdf_id,
+                    self.current_page,
+                    duration_seconds,
+                    self.page_start_time,
+                    end_time
+                ))
+                if len(self.pending_page_times) >= self.page_time_batch_size:
+                    self._flush_page_times()
+                
+                logger.debug(f"💾 Recorded page {self.current_page} time: {duration_seconds}s")
                 
         except Exception as e:
             logger.error(f"❌ Error saving page time: {e}")
     
+    def _arm_page_count_timer(self):
+        """Schedule a stats update for when the current page starts to count as visited"""
+        if self.current_page in self.pages_visited:
+            self.page_count_timer.stop()
+        else:
+            self.page_count_timer.start(self.min_page_visit_ms)
+    
+    def _flush_page_times(self):
+        """Write queued page timings to the database in one batch; returns False on failure"""
+        if not self.pending_page_times:
+            return True
+        
+        try:
+            self.db_manager.save_page_times(self.pending_page_times)
+            self.pending_page_times = []
+            return True
+        except Exception as e:
+            # Keep the rows so the next flush retries them
+            logger.error(f"❌ Error saving {len(self.pending_page_times)} page times: {e}")
+            return False
+    
     def _record_activity(self):
         """Record user activity and handle idle state changes"""
+        # Skip the timer restart for bursts of events while already active
+        if (not self.is_idle and self.last_activity_time.isValid() and
+                self.last_activity_time.elapsed() < self.activity_throttle_ms):
+            return
+        
         self.last_activity_time.restart()
+        if self.current_session_id:
+            self.idle_timer.start(self.idle_threshold_ms)
         
         if self.is_idle:
-            # Calculate idle duration before resuming
-            if self.idle_start_timer.isValid():
-                idle_duration = self.idle_start_timer.elapsed() // 1000
-                self.total_idle_time += idle_duration
-                self.current_idle_duration = 0
-            
+            # Leaving idle folds the idle period into the total
             self._set_idle_state(False)
     
     def _check_idle_timeout(self):
-        """Enhanced idle detection with grace period"""
-        if not self.last_activity_time.isValid() or self.is_manually_paused:
+        """Go idle once the idle threshold passes without any activity"""
+        if not self.current_session_id or self.is_manually_paused or self.is_idle:
             return
-            
-        elapsed = self.last_activity_time.elapsed()
         
-        if not self.is_idle and elapsed > self.idle_threshold_ms:
-            # Check if application is active/visible
-            app = QApplication.instance()
-            if app and not app.activeWindow():
-                # App is minimized/not focused - go idle immediately
-                self._set_idle_state(True, manual=False)
-            else:
-                # Normal idle timeout
-                self._set_idle_state(True, manual=False)
+        self._set_idle_state(True, manual=False)
     
     def _set_idle_state(self, is_idle, manual=False):
         """Enhanced idle state management with proper timing"""
         if self.is_idle == is_idle:
             return
+        
+        if is_idle:
+            # Save current page time before going idle; this has to run while
+            # still active, since idle sessions record no page time
+            if self.page_timer.isValid():
+                self._save_current_page_time()
+                self.page_timer.invalidate()
+            self.page_count_timer.stop()
+            self._flush_page_times()
             
         previous_state = self.is_idle
         self.is_idle = is_idle
@@ -412,11 +650,6 @@ class SessionTimer(QObject):
             # Entering idle state
             self.idle_start_timer.start()
             
-            # Save current page time before going idle
-            if self.page_timer.isValid():
-                self._save_current_page_time()
-                self.page_timer.invalidate()
-            
             idle_type = "manual" if manual else "auto"
             logger.debug(f"😴 Entering idle state ({idle_type}) - Session {self.current_session_id}")
             
@@ -424,39 +657,40 @@ class SessionTimer(QObject):
             # Exiting idle state
             if self.idle_start_timer.isValid():
                 # Add the idle period to total
-                idle_duration = self.idle_start_timer.elapsed() // 1000
-                self.total_idle_time += idle_duration
+                self.total_idle_ms += self.idle_start_timer.elapsed()
                 self.idle_start_timer.invalidate()
             
             # Restart page timer if we have a session
             if self.current_session_id:
                 self.page_start_time = time.time()
                 self.page_timer.start()
+                self._arm_page_count_timer()
             
             logger.debug(f"🔄 Exiting idle state - Session {self.current_session_id}")
         
         self.idle_detected.emit(is_idle)
+        self._emit_stats_update()
     
     def _calculate_reading_speed(self):
         """Calculate and emit current reading speed metrics"""
-        stats = self.get_current_stats()
-        if not stats or stats['pages_visited'] == 0:
+        stats = self._refresh_stats()
+        if not stats or stats.pages_visited == 0:
             return
         
         try:
             # Calculate instantaneous speed
-            active_minutes = stats['active_time_seconds'] / 60.0
+            active_minutes = stats.active_time_seconds / 60.0
             if active_minutes > 0:
-                current_speed = stats['pages_visited'] / active_minutes
-                avg_page_time = stats['active_time_seconds'] / stats['pages_visited']
+                current_speed = stats.pages_visited / active_minutes
+                avg_page_time = stats.active_time_seconds / stats.pages_visited
                 
                 speed_metrics = {
                     'session_id': self.current_session_id,
                     'current_speed_ppm': current_speed,
                     'average_time_per_page': avg_page_time,
-                    'pages_read_this_session': stats['pages_visited'],
+                    'pages_read_this_session': stats.pages_visited,
                     'active_time_minutes': active_minutes,
-                    'efficiency_percent': (stats['active_time_seconds'] / stats['total_time_seconds']) * 100
+                    'efficiency_percent': (stats.active_time_seconds / stats.total_time_seconds) * 100
                 }
                 
                 self.reading_speed_updated.emit(speed_metrics)
@@ -478,29 +712,14 @@ class SessionTimer(QObject):
             'reading_efficiency': (active_time_seconds / self.session_timer.elapsed() * 1000) * 100
         }
     
-    def _save_session_metadata(self, session_stats, reading_metrics):
-        """Save comprehensive session metadata for analytics"""
-        try:
-            # Update reading metrics in database
-            if reading_metrics.get('final_reading_speed_ppm'):
-                self.db_manager.update_reading_metrics(
-                    pdf_id=self.pdf_id,
-                    exercise_pdf_id=self.exercise_pdf_id,
-                    topic_id=self.topic_id,
-                    pages_per_minute=reading_metrics['final_reading_speed_ppm'],
-                    average_time_per_page_seconds=reading_metrics['final_avg_time_per_page'],
-                    pages_read=len(self.pages_visited),
-                    time_spent_seconds=session_stats.get('active_time_seconds', 0) if session_stats else 0
-                )
-                
-                logger.info(f"📊 Updated reading metrics: {reading_metrics['final_reading_speed_ppm']:.2f} PPM")
-                
-        except Exception as e:
-            logger.error(f"❌ Error saving session metadata: {e}")
-    
     def _record_heartbeat(self):
         """Record periodic heartbeat for app state monitoring"""
-        if self.current_session_id and not self.is_idle:
+        if not self.current_session_id:
+            return
+        
+        # Bound how many page timings sit only in memory
+        self._flush_page_times()
+        if not self.is_idle:
             logger.debug(f"💓 Session heartbeat - {self.current_session_id}")
     
     def _emit_stats_update(self):
@@ -523,15 +742,19 @@ class SessionTimer(QObject):
         self.topic_id = None
         self.is_exercise = False
         self.session_start_time = None
+        self._stats = None
         self.current_page = 1
         self.previous_page = 1
         self.pages_visited.clear()
         self.page_visit_log.clear()
-        self.total_idle_time = 0
-        self.current_idle_duration = 0
+        self.pending_page_times = []
+        self.total_idle_ms = 0
         self.is_idle = False
         self.is_manually_paused = False
         self.page_start_time = None
+        self.pending_page = None
+        self.page_change_timer.stop()
+        self.page_count_timer.stop()
         
         # Invalidate timers
         if self.page_timer.isValid():
@@ -547,10 +770,41 @@ class SessionTimer(QObject):
 class ReadingIntelligence(QObject):
     """Enhanced reading analytics and intelligent time estimation"""
     
+    # Reading pace buckets: seconds-per-page upper bounds and their descriptions
+    _PACE_THRESHOLDS = (60, 90, 150)
+    _PACE_DESCS = ("Fast pace", "Moderate pace", "Careful pace", "Thorough pace")
+    
+    # Session pace rating: pages-per-minute lower bounds and their labels
+    _PACE_RATING_CUTS = (0.4, 0.8, 1.5)
+    _PACE_RATING_LABELS = ('slow', 'careful', 'moderate', 'fast')
+    
+    # Metrics confidence: pages-read lower bounds and their labels
+    _CONFIDENCE_CUTS = (5, 20)
+    _CONFIDENCE_LABELS = ('low', 'medium', 'high')
+    
+    # Estimation strategy descriptions by metrics confidence
+    _STRATEGY_DESCRIPTIONS = {
+        'high': "Based on your reading data ({sample_size} pages)",
+        'medium': "Based on limited data ({sample_size} pages)",
+    }
+    _DEFAULT_STRATEGY_DESCRIPTION = "Estimated (insufficient reading data)"
+    
     def __init__(self, db_manager):
         super().__init__()
         self.db_manager = db_manager
         
+        # Topic lookups never change for a given PDF, so resolve them once
+        self._topic_id_cache = {}
+        
+        # Resolved reading pace per PDF: {(pdf_id, exercise_pdf_id): (avg_time_per_page,
+        # confidence, strategy_used)}; cleared when a session ends
+        self._pace_cache = {}
+        
+        # Daily, streak and average daily reading analytics: {key: (computed_at, value)},
+        # also cleared on session end
+        self._analytics_cache = {}
+        self._analytics_cache_ttl = 60  # seconds
+        
     def get_reading_speed(self, pdf_id=None, exercise_pdf_id=None, topic_id=None, user_wide=False):
         """Get detailed reading speed metrics with confidence scoring"""
         try:
@@ -560,65 +814,27 @@ class ReadingIntelligence(QObject):
                 topic_id=topic_id,
                 user_wide=user_wide
             )
-            
-            if metrics:
-                # Add confidence scoring
-                pages_read = metrics.get('total_pages_read', 0)
-                if pages_read >= 20:
-                    confidence = 'high'
-                elif pages_read >= 5:
-                    confidence = 'medium'
-                else:
-                    confidence = 'low'
-                
-                metrics['confidence'] = confidence
-                metrics['sample_size'] = pages_read
-                
-            return metrics
-            
-        except Exception as e:
+        except (psycopg2.Error, OSError) as e:
+            # The DB layer raises ConnectionError, an OSError, once connect retries run out
             logger.error(f"❌ Error getting reading speed: {e}")
             return None
+        
+        return self._add_confidence(metrics)
+    
+    def _add_confidence(self, metrics):
+        """Add confidence scoring to a reading metrics row"""
+        if not metrics:
+            return metrics
+        
+        pages_read = metrics.get('total_pages_read') or 0
+        metrics['confidence'] = self._CONFIDENCE_LABELS[bisect_right(self._CONFIDENCE_CUTS, pages_read)]
+        metrics['sample_size'] = pages_read
+        return metrics
     
     def estimate_finish_time(self, pdf_id=None, exercise_pdf_id=None, current_page=1, total_pages=1):
         """Intelligent finish time estimation with multiple fallback strategies"""
         try:
-            # Strategy 1: PDF-specific metrics
-            metrics = self.get_reading_speed(pdf_id=pdf_id, exercise_pdf_id=exercise_pdf_id)
-            
-            # Strategy 2: Topic-level metrics
-            if not metrics or metrics.get('confidence') == 'low':
-                if pdf_id:
-                    pdf_info = self.db_manager.get_pdf_by_id(pdf_id)
-                    topic_id = pdf_info.get('topic_id') if pdf_info else None
-                elif exercise_pdf_id:
-                    exercise_info = self.db_manager.get_exercise_pdf_by_id(exercise_pdf_id)
-                    if exercise_info:
-                        parent_pdf = self.db_manager.get_pdf_by_id(exercise_info['parent_pdf_id'])
-                        topic_id = parent_pdf.get('topic_id') if parent_pdf else None
-                    else:
-                        topic_id = None
-                
-                if topic_id:
-                    metrics = self.get_reading_speed(topic_id=topic_id)
-            
-            # Strategy 3: User-wide metrics
-            if not metrics or metrics.get('confidence') == 'low':
-                metrics = self.get_reading_speed(user_wide=True)
-            
-            # Strategy 4: Intelligent defaults based on content type
-            if not metrics or not metrics.get('average_time_per_page_seconds'):
-                if exercise_pdf_id:
-                    # Exercise PDFs typically take longer
-                    avg_time_per_page = 120  # 2 minutes per page
-                    confidence = 'low'
-                else:
-                    # Regular reading material
-                    avg_time_per_page = 90   # 1.5 minutes per page
-                    confidence = 'low'
-            else:
-                avg_time_per_page = float(metrics['average_time_per_page_seconds'])
-                confidence = metrics.get('confidence', 'low')
+            avg_time_per_page, confidence, strategy_used = self._resolve_pace(pdf_id, exercise_pdf_id)
             
             # Calculate estimates
             pages_remaining = max(0, total_pages - current_page + 1)
@@ -629,10 +845,7 @@ class ReadingIntelligence(QObject):
             avg_session_length = 25 * 60  # 25 minutes in seconds
             sessions_needed = max(1, estimated_seconds / avg_session_length)
             
-            # Estimate finish date based on user's reading patterns
-            finish_date_estimate = self._estimate_finish_date(estimated_minutes)
-            
-            return {
+            estimation = {
                 'pages_remaining': pages_remaining,
                 'estimated_seconds': estimated_seconds,
                 'estimated_minutes': estimated_minutes,
@@ -640,58 +853,130 @@ class ReadingIntelligence(QObject):
                 'sessions_needed': round(sessions_needed),
                 'average_time_per_page': avg_time_per_page,
                 'confidence': confidence,
-                'strategy_used': self._get_strategy_description(metrics),
-                'finish_date_estimate': finish_date_estimate,
+                'strategy_used': strategy_used,
+                'finish_date_estimate': self._estimate_finish_date(estimated_minutes),
                 'reading_pace_description': self._get_pace_description(avg_time_per_page)
             }
             
+            return estimation
+            
         except Exception as e:
             logger.error(f"❌ Error estimating finish time: {e}")
             return None
     
+    def _resolve_pace(self, pdf_id=None, exercise_pdf_id=None):
+        """Resolve (avg_time_per_page, confidence, strategy_used) for a PDF, caching the result"""
+        pace_key = (pdf_id, exercise_pdf_id)
+        cached = self._pace_cache.get(pace_key)
+        if cached is not None:
+            return cached
+        
+        # Fetch PDF, topic and user-wide metrics in one round-trip
+        topic_id = self._get_topic_id(pdf_id, exercise_pdf_id)
+        metrics_by_scope = self.db_manager.get_reading_metrics_bulk(
+            pdf_id=pdf_id,
+            exercise_pdf_id=exercise_pdf_id,
+            topic_id=topic_id
+        )
+        
+        # Strategy 1: PDF-specific metrics
+        metrics = self._add_confidence(metrics_by_scope.get('specific'))
+        
+        # Strategy 2: Topic-level metrics
+        if not metrics or metrics.get('confidence') == 'low':
+            if topic_id:
+                metrics = self._add_confidence(metrics_by_scope.get('topic'))
+        
+        # Strategy 3: User-wide metrics
+        if not metrics or metrics.get('confidence') == 'low':
+            metrics = self._add_confidence(metrics_by_scope.get('user_wide'))
+        
+        # Strategy 4: Intelligent defaults based on content type
+        if not metrics or not metrics.get('average_time_per_page_seconds'):
+            if exercise_pdf_id:
+                # Exercise PDFs typically take longer
+                avg_time_per_page = 120  # 2 minutes per page
+                confidence = 'low'
+            else:
+                # Regular reading material
+                avg_time_per_page = 90   # 1.5 minutes per page
+                confidence = 'low'
+        else:
+            avg_time_per_page = float(metrics['average_time_per_page_seconds'])
+            confidence = metrics.get('confidence', 'low')
+        
+        pace = (avg_time_per_page, confidence, self._get_strategy_description(metrics))
+        
+        # An empty result means the lookup failed (a successful one always has the
+        # user-wide row), so the defaults are retried next time instead of cached
+        if metrics_by_scope:
+            self._pace_cache[pace_key] = pace
+        return pace
+    
+    def clear_cache(self):
+        """Drop cached estimates so the next call reflects newly saved sessions"""
+        self._pace_cache.clear()
+        self._analytics_cache.clear()
+    
+    def _get_cached_analytics(self, key):
+        """Return a cached analytics value if it is younger than the TTL"""
+        entry = self._analytics_cache.get(key)
+        if entry and time.monotonic() - entry[0] < self._analytics_cache_ttl:
+            return entry[1]
+        return None
+    
+    def _set_cached_analytics(self, key, value):
+        if value is not None:
+            self._analytics_cache[key] = (time.monotonic(), value)
+    
     def get_daily_stats(self, date=None):
         """Get comprehensive daily reading statistics"""
+        if date is None:
+            date = datetime.now().date()
+        
+        cache_key = ('daily_stats', date)
+        cached = self._get_cached_analytics(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            if date is None:
-                date = datetime.now().date()
-            
             stats = self.db_manager.get_daily_reading_stats(date)
-            
-            if stats:
-                # Add derived metrics
-                sessions_count = stats.get('sessions_count', 0)
-                total_time = stats.get('total_time_seconds', 0)
-                
-                if sessions_count > 0:
-                    stats['avg_session_length'] = total_time / sessions_count
-                else:
-                    stats['avg_session_length'] = 0
-                
-                # Add goal progress (if goals are implemented)
-                stats['daily_goal_progress'] = self._calculate_daily_goal_progress(stats)
-                
-            return stats
-            
-        except Exception as e:
+        except (psycopg2.Error, OSError) as e:
             logger.error(f"❌ Error getting daily stats: {e}")
             return None
+        
+        if stats:
+            # Add derived metrics
+            sessions_count = stats.get('sessions_count', 0)
+            total_time = stats.get('total_time_seconds', 0)
+            
+            if sessions_count > 0:
+                stats['avg_session_length'] = total_time / sessions_count
+            else:
+                stats['avg_session_length'] = 0
+            
+            # Add goal progress (if goals are implemented)
+            stats['daily_goal_progress'] = self._calculate_daily_goal_progress(stats)
+            
+        self._set_cached_analytics(cache_key, stats)
+        return stats
     
     def get_streak_analytics(self):
         """Get detailed reading streak analytics"""
+        cached = self._get_cached_analytics('streaks')
+        if cached is not None:
+            return cached
+        
+        # Get reading streaks
         try:
-            # Get reading streaks
             streaks = self.db_manager.get_reading_streaks() if hasattr(self.db_manager, 'get_reading_streaks') else None
-            
-            if streaks:
-                # Add streak quality metrics
-                streak_quality = self._calculate_streak_quality(streaks)
-                streaks.update(streak_quality)
-                
-            return streaks
-            
-        except Exception as e:
+        except (psycopg2.Error, OSError) as e:
             logger.error(f"❌ Error getting streak analytics: {e}")
             return None
+        
+        # Quality, average minutes and consistency ratings come from the streaks query
+        self._set_cached_analytics('streaks', streaks)
+        return streaks
     
     def get_topic_analytics(self, topic_id):
         """Get comprehensive topic-level analytics"""
@@ -703,11 +988,10 @@ class ReadingIntelligence(QObject):
             total_pages = sum(pdf.get('total_pages', 0) for pdf in pdfs)
             read_pages = sum(pdf.get('current_page', 1) - 1 for pdf in pdfs)
             
-            # Get topic reading sessions
+            # Get topic reading sessions for all PDFs in one query
             topic_sessions = []
-            for pdf in pdfs:
-                sessions = self.get_session_history(pdf_id=pdf['id'])
-                topic_sessions.extend(sessions or [])
+            if pdfs:
+                topic_sessions = self.get_session_history(pdf_ids=[pdf['id'] for pdf in pdfs]) or []
             
             # Calculate comprehensive topic analytics
             analytics = {
@@ -733,51 +1017,45 @@ class ReadingIntelligence(QObject):
             logger.error(f"❌ Error getting topic analytics: {e}")
             return None
     
-    def get_session_history(self, days=7, pdf_id=None, exercise_pdf_id=None):
+    def get_session_history(self, days=7, pdf_id=None, exercise_pdf_id=None, pdf_ids=None):
         """Get enhanced session history with analytics"""
         try:
             sessions = self.db_manager.get_session_history(
                 days=days,
                 pdf_id=pdf_id,
-                exercise_pdf_id=exercise_pdf_id
+                exercise_pdf_id=exercise_pdf_id,
+                pdf_ids=pdf_ids
             )
-            
-            # Enhance sessions with derived metrics
-            if sessions:
-                for session in sessions:
-                    session['efficiency'] = self._calculate_session_efficiency(session)
-                    session['pace_rating'] = self._rate_reading_pace(session)
-                    session['quality_score'] = self._calculate_session_quality(session)
-            
-            return sessions
-            
-        except Exception as e:
+        except (psycopg2.Error, OSError) as e:
             logger.error(f"❌ Error getting session history: {e}")
             return []
+        
+        # Enhance sessions with derived metrics, scoring all rows in one pass
+        if sessions:
+            scores = self.score_sessions_batch(
+                [session.get('total_time_seconds', 0) for session in sessions],
+                [session.get('active_time_seconds', 0) for session in sessions],
+                [session.get('pages_visited', 0) for session in sessions]
+            )
+            for session, efficiency, pace_rating, quality_score in zip(sessions, *scores):
+                session['efficiency'] = efficiency
+                session['pace_rating'] = pace_rating
+                session['quality_score'] = quality_score
+        
+        return sessions
     
     def _estimate_finish_date(self, estimated_minutes):
         """Estimate when user will finish based on reading patterns"""
         try:
-            # Get user's average daily reading time from recent history
-            recent_sessions = self.get_session_history(days=14)
-            if not recent_sessions:
-                return None
-            
-            # Calculate average daily reading time
-            daily_totals = {}
-            for session in recent_sessions:
-                session_date = session.get('start_time', '')
-                if isinstance(session_date, str):
-                    session_date = session_date.split('T')[0]
-                else:
-                    session_date = session_date.strftime('%Y-%m-%d') if session_date else ''
-                if session_date:
-                    daily_totals[session_date] = daily_totals.get(session_date, 0) + session.get('total_time_seconds', 0)
-            
-            if not daily_totals:
-                return None
-            
-            avg_daily_minutes = sum(daily_totals.values()) / len(daily_totals) / 60
+            # Get user's average daily reading time, aggregated per day in SQL
+            avg_daily_minutes = self._get_cached_analytics('avg_daily_minutes')
+            if avg_daily_minutes is None:
+                daily_totals = self.db_manager.get_daily_session_totals(days=14)
+                
+                # No recent history caches as 0, so it is not re-queried on every estimate
+                total_seconds = sum(float(day['total_seconds'] or 0) for day in daily_totals)
+                avg_daily_minutes = total_seconds / len(daily_totals) / 60 if daily_totals else 0
+                self._set_cached_analytics('avg_daily_minutes', avg_daily_minutes)
             
             if avg_daily_minutes > 0:
                 days_needed = estimated_minutes / avg_daily_minutes
@@ -799,26 +1077,33 @@ class ReadingIntelligence(QObject):
         if not metrics:
             return "Default estimation (no reading history)"
         
-        confidence = metrics.get('confidence', 'low')
-        sample_size = metrics.get('sample_size', 0)
+        template = self._STRATEGY_DESCRIPTIONS.get(metrics.get('confidence', 'low'))
+        if template is None:
+            return self._DEFAULT_STRATEGY_DESCRIPTION
+        return template.format(sample_size=metrics.get('sample_size', 0))
+    
+    def _get_topic_id(self, pdf_id=None, exercise_pdf_id=None):
+        """Resolve the topic for a PDF or exercise PDF, caching the result"""
+        cache_key = (pdf_id, exercise_pdf_id)
+        if cache_key in self._topic_id_cache:
+            return self._topic_id_cache[cache_key]
+        
+        topic_id = None
+        if pdf_id:
+            pdf_info = self.db_manager.get_pdf_by_id(pdf_id)
+            topic_id = pdf_info.get('topic_id') if pdf_info else None
+        elif exercise_pdf_id:
+            exercise_info = self.db_manager.get_exercise_pdf_by_id(exercise_pdf_id)
+            if exercise_info:
+                parent_pdf = self.db_manager.get_pdf_by_id(exercise_info['parent_pdf_id'])
+                topic_id = parent_pdf.get('topic_id') if parent_pdf else None
         
-        if confidence == 'high':
-            return f"Based on your reading data ({sample_size} pages)"
-        elif confidence == 'medium':
-            return f"Based on limited data ({sample_size} pages)"
-        else:
-            return "Estimated (insufficient reading data)"
+        self._topic_id_cache[cache_key] = topic_id
+        return topic_id
     
     def _get_pace_description(self, avg_time_per_page):
         """Get descriptive text for reading pace"""
-        if avg_time_per_page < 60:
-            return "Fast pace"
-        elif avg_time_per_page < 90:
-            return "Moderate pace"
-        elif avg_time_per_page < 150:
-            return "Careful pace"
-        else:
-            return "Thorough pace"
+        return self._PACE_DESCS[bisect_right(self._PACE_THRESHOLDS, avg_time_per_page)]
     
     def _calculate_daily_goal_progress(self, daily_stats):
         """Calculate progress toward daily reading goals"""
@@ -833,26 +1118,6 @@ class ReadingIntelligence(QObject):
             'goal_met': actual_minutes >= target_minutes
         }
     
-    def _calculate_streak_quality(self, streaks):
-        """Calculate quality metrics for reading streaks"""
-        current_streak = streaks.get('current_streak_days', 0)
-        streak_time = streaks.get('streak_total_time', 0)
-        
-        if current_streak > 0:
-            avg_time_per_day = streak_time / current_streak / 60  # minutes per day
-            
-            quality = 'excellent' if avg_time_per_day >= 60 else \
-                     'good' if avg_time_per_day >= 30 else \
-                     'fair' if avg_time_per_day >= 15 else 'minimal'
-            
-            return {
-                'streak_quality': quality,
-                'avg_minutes_per_day': round(avg_time_per_day),
-                'consistency_rating': self._rate_consistency(current_streak, avg_time_per_day)
-            }
-        
-        return {'streak_quality': 'none', 'avg_minutes_per_day': 0, 'consistency_rating': 'none'}
-    
     def _estimate_topic_completion(self, pdfs):
         """Estimate time to complete all PDFs in a topic"""
         total_remaining_pages = 0
@@ -943,60 +1208,25 @@ class ReadingIntelligence(QObject):
         
         return round(consistency_score)
     
-    def _calculate_session_efficiency(self, session):
-        """Calculate session efficiency (active time / total time)"""
-        total_time = session.get('total_time_seconds', 0)
-        active_time = session.get('active_time_seconds', 0)
+    @classmethod
+    def score_sessions_batch(cls, totals, actives, pages):
+        """Score sessions column-wise, returning (efficiencies, pace_ratings, quality_scores)"""
+        efficiencies = [
+            (active / total) * 100 if total > 0 else 0
+            for total, active in zip(totals, actives)
+        ]
         
-        if total_time > 0:
-            return (active_time / total_time) * 100
-        return 0
-    
-    def _rate_reading_pace(self, session):
-        """Rate the reading pace of a session"""
-        active_time = session.get('active_time_seconds', 0)
-        pages = session.get('pages_visited', 0)
-        
-        if active_time > 0 and pages > 0:
-            pace = pages / (active_time / 60)  # pages per minute
-            
-            if pace >= 1.5:
-                return 'fast'
-            elif pace >= 0.8:
-                return 'moderate'
-            elif pace >= 0.4:
-                return 'careful'
-            else:
-                return 'slow'
-        
-        return 'unknown'
-    
-    def _calculate_session_quality(self, session):
-        """Calculate overall session quality score"""
-        efficiency = self._calculate_session_efficiency(session)
-        
-        # Base score on efficiency
-        quality_score = efficiency * 0.6  # 60% weight for efficiency
-        
-        # Add bonus for longer sessions (up to 20 points)
-        total_time = session.get('total_time_seconds', 0)
-        time_bonus = min(20, (total_time / 1800) * 20)  # Bonus for 30+ minute sessions
-        quality_score += time_bonus
+        # Pace in pages per minute; sessions without active time or pages are unrated
+        cuts, labels = cls._PACE_RATING_CUTS, cls._PACE_RATING_LABELS
+        pace_ratings = [
+            labels[bisect_right(cuts, page_count * 60 / active)] if active > 0 and page_count > 0 else 'unknown'
+            for active, page_count in zip(actives, pages)
+        ]
         
-        # Add bonus for pages read (up to 20 points)
-        pages = session.get('pages_visited', 0)
-        page_bonus = min(20, pages * 2)  # 2 points per page, max 20
-        quality_score += page_bonus
-        
-        return min(100, round(quality_score))
-    
-    def _rate_consistency(self, streak_days, avg_minutes_per_day):
-        """Rate reading consistency"""
-        if streak_days >= 7 and avg_minutes_per_day >= 30:
-            return 'excellent'
-        elif streak_days >= 5 and avg_minutes_per_day >= 20:
-            return 'good'
-        elif streak_days >= 3 and avg_minutes_per_day >= 15:
-            return 'fair'
-        else:
-            return 'poor'
\ No newline at end of file
+        # 60% weight for efficiency, up to 20 points for 30+ minute sessions
+        # and up to 20 points for pages read (2 points per page)
+        quality_scores = [
+            min(100, round(eff * 0.6 + min(20, (total / 1800) * 20) + min(20, page_count * 2)))
+            for eff, total, page_count in zip(efficiencies, totals, pages)
+        ]
+        return efficiencies, pace_ratings, quality_scores